@@ -1,11 +1,21 @@
 import asyncio
+import random
+
+import aiohttp
 
 from dashboard.generate import generate_image
 
+INTERVAL = 600
+JITTER = 30
+
 
 async def generate_image_every_minute() -> None:
-    while True:
-        await asyncio.gather(asyncio.sleep(600), generate_image())
+    connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300, keepalive_timeout=75)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        while True:
+            # Jitter the interval so we don't wake on the same boundaries as everyone else
+            delay = INTERVAL + random.uniform(-JITTER, JITTER)
+            await asyncio.gather(asyncio.sleep(delay), generate_image(session))
 
 
 def run() -> None:
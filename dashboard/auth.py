@@ -4,6 +4,7 @@ import aiohttp
 class BearerAuth(aiohttp.BasicAuth):
     def __init__(self, token: str):
         self.token = token
+        self._header = f"Bearer {token}"
 
     def encode(self) -> str:
-        return f"Bearer {self.token}"
+        return self._header
@@ -1,13 +1,32 @@
-from datetime import datetime, timedelta
-from typing import Final, Generic, TypeVar
-
-from dashboard.calendar import TZ
+import asyncio
+import time
+from collections.abc import Callable, Coroutine
+from typing import Any, Final, Generic, TypeVar
 
 T = TypeVar("T")
 
 
+class CacheEntry(Generic[T]):
+    data: T
+    expires_at: float
+    etag: str | None
+    last_modified: str | None
+
+    def __init__(
+        self,
+        data: T,
+        expires_at: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        self.data = data
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+
 class Cache(Generic[T]):
-    _cache: dict[str, tuple[T, datetime]]
+    _cache: dict[str, CacheEntry[T]]
     expiration: Final[int]
 
     def __init__(self, expiration: int) -> None:
@@ -16,14 +35,49 @@ class Cache(Generic[T]):
 
     def load(self, key: str) -> tuple[T | None, bool]:
         """Return the data and a boolean indicating if the data is stale."""
-        if key in self._cache:
-            data, last_modified = self._cache[key]
-            now = datetime.now(tz=TZ)
-            if last_modified + timedelta(seconds=self.expiration) > now:
-                return data, False
-            return data, True
+        entry = self._cache.get(key)
+        if entry is None:
+            return None, True
+
+        return entry.data, entry.expires_at <= time.monotonic()
+
+    def validators(self, key: str) -> tuple[str | None, str | None]:
+        """Return the ETag and Last-Modified values the data was saved with."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None, None
+        return entry.etag, entry.last_modified
+
+    def save(
+        self,
+        key: str,
+        data: T,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        self._cache[key] = CacheEntry(data, time.monotonic() + self.expiration, etag, last_modified)
+
+    def refresh(self, key: str) -> None:
+        """Mark existing data as fresh again, e.g. after a 304 Not Modified response."""
+        if entry := self._cache.get(key):
+            entry.expires_at = time.monotonic() + self.expiration
+
+
+class InFlight(Generic[T]):
+    _tasks: dict[str, "asyncio.Task[T]"]
+
+    def __init__(self) -> None:
+        self._tasks = {}
 
-        return None, True
+    async def run(self, key: str, factory: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        """Await the pending task for the key, or start one with the factory if there is none.
 
-    def save(self, key: str, data: T) -> None:
-        self._cache[key] = (data, datetime.now(tz=TZ))
+        Concurrent callers with the same key share a single task, so only one request is made.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # Shield the shared task, so one caller being cancelled does not cancel it for the others.
+        return await asyncio.shield(task)
@@ -1,16 +1,18 @@
 import asyncio
-import json
+import heapq
+import itertools
 import os
-from collections import defaultdict
 from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Any, Final
 from zoneinfo import ZoneInfo
 
+import orjson
 from aiohttp.client import ClientSession
 
 TZ: Final = ZoneInfo(os.getenv("TZ", "America/New_York"))
+MAX_CONCURRENCY: Final = int(os.getenv("HOMEASSISTANT_MAX_CONCURRENCY", "5"))
 
 
 @dataclass(frozen=True, order=True)
@@ -23,9 +25,9 @@ class Event:
     @staticmethod
     def get_datetime(name: str, d: dict[str, str]) -> tuple[datetime, bool]:
         if dt := d.get("dateTime"):
-            return datetime.strptime(dt, "%Y-%m-%dT%H:%M:%S%z").astimezone(TZ), False
+            return datetime.fromisoformat(dt).astimezone(TZ), False
         if dt := d.get("date"):
-            return datetime.strptime(dt, "%Y-%m-%d").astimezone(tz=TZ), True
+            return datetime.fromisoformat(dt).replace(tzinfo=TZ), True
         msg = f"The calendar event '{name}', is missing a start date"
         raise ValueError(msg)
 
@@ -46,19 +48,23 @@ async def get_calendars(
 ) -> dict[date, list[Event]]:
     start_str = datetime(start.year, start.month, start.day, tzinfo=TZ).isoformat()
     end_str = datetime(end.year, end.month, end.day, tzinfo=TZ).isoformat()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
 
     async def get_calendar_data(calendar: str) -> Any:
         url = f"{api_url}calendars/calendar.{calendar}?start={start_str}&end={end_str}"
-        async with session.get(url, headers={"Content-Type": "application/json"}) as resp:
-            data = await resp.text()
-            return json.loads(data)
+        headers = {"Accept": "application/json"}
+        async with semaphore, session.get(url, headers=headers) as resp:
+            return orjson.loads(await resp.read())
 
     results = await asyncio.gather(
         *[get_calendar_data(calendar) for calendar in calendar_entity_ids]
     )
 
-    grouped = defaultdict(list)
-    for event in sorted({Event.from_dict(event) for result in results for event in result}):
-        grouped[event.start.date()].append(event)
-
-    return grouped
+    # Each calendar is (nearly) sorted already, so merge them rather than sorting everything.
+    # Events shared by several calendars end up adjacent, and are collapsed by the first groupby.
+    merged = heapq.merge(*[sorted(map(Event.from_dict, result)) for result in results])
+    unique = (event for event, _ in itertools.groupby(merged))
+    return {
+        day: list(day_events)
+        for day, day_events in itertools.groupby(unique, key=lambda event: event.start.date())
+    }
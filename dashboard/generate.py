@@ -1,10 +1,11 @@
 import asyncio
 import base64
+import functools
 import itertools
 import os
 from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from pathlib import Path
 from typing import Final, cast
 
@@ -27,6 +28,14 @@ TOKEN: Final = os.getenv("HOMEASSISTANT_TOKEN", "")
 OPENWEATHER_API_KEY: Final = os.getenv("OPENWEATHERMAP_API_KEY", "")
 LATITUDE: Final = float(os.getenv("LATITUDE", "0"))
 LONGITUDE: Final = float(os.getenv("LONGITUDE", "0"))
+STATIC_PATH: Final = Path(__file__).parent / "static"
+DEBUG_DUMP_HTML: Final = bool(os.getenv("DEBUG_DUMP_HTML"))
+AUTH: Final = BearerAuth(TOKEN)
+
+
+_NO_EVENTS: Final[tuple[Event, ...]] = ()
+_HTI: Html2Image | None = None
+_HTI_LOCK: Final = asyncio.Lock()
 
 
 @dataclass(order=True)
@@ -47,9 +56,9 @@ def get_calendar_dates(current_date: datetime, weeks: int = 4) -> tuple[list[dat
     Returns:
         A tuple containing a list of dates and the end date of the range.
     """
-    start: datetime = current_date - timedelta(days=current_date.weekday())
-    end: datetime = start + timedelta(weeks=weeks)
-    return [(start + timedelta(days=i)).date() for i in range((end - start).days)], end.date()
+    start = current_date.toordinal() - current_date.weekday()
+    end = start + 7 * weeks
+    return [date.fromordinal(day) for day in range(start, end)], date.fromordinal(end)
 
 
 def generate_dates_with_events(
@@ -68,7 +77,7 @@ def generate_dates_with_events(
     return [
         DateCount(
             day=dt,
-            events=len(events.get(dt, [])),
+            events=len(events.get(dt, _NO_EVENTS)),
             is_past=dt < today,
             is_today=dt == today,
         )
@@ -88,7 +97,6 @@ async def fetch_data(
     Args:
         session: The aiohttp client session.
         api_url: The API URL.
-        token: The authentication token.
         calendars: List of calendar entity IDs.
         today: The current date.
         end: The end date of the calendar range.
@@ -96,17 +104,24 @@ async def fetch_data(
     Returns:
         A tuple containing weather data and calendar events.
     """
-    weather_task = get_weather(OPENWEATHER_API_KEY, LATITUDE, LONGITUDE)
-    events_task = get_calendars(session, api_url, calendars, today, end)
-    task_results = await asyncio.gather(*[weather_task, events_task])
+    # Share the pooled connector, but only send the Home Assistant token to Home Assistant
+    async with aiohttp.ClientSession(
+        connector=session.connector, connector_owner=False, auth=AUTH
+    ) as hass_session:
+        weather_task = get_weather(session, OPENWEATHER_API_KEY, LATITUDE, LONGITUDE)
+        events_task = get_calendars(hass_session, api_url, calendars, today, end)
+        task_results = await asyncio.gather(*[weather_task, events_task])
     weather = cast(Weather, task_results[0])
     events = cast(Mapping[date, Sequence[Event]], task_results[1])
     return weather, events
 
 
+@functools.cache
 def get_template(template_path: Path) -> Template:
     """Read the data from the file and return it as a jinja2 template
 
+    The parsed template is cached, the file is only read once per process.
+
     Args:
         template_path: The path to the template file.
 
@@ -118,8 +133,9 @@ def get_template(template_path: Path) -> Template:
         return Template(template_html)
 
 
+@functools.cache
 def get_file_contents(file_path: Path) -> str:
-    """Get contents of file
+    """Get contents of file, cached for the lifetime of the process
 
     Args:
         output_path: The path of the file to read.
@@ -131,25 +147,43 @@ def get_file_contents(file_path: Path) -> str:
         return f.read()
 
 
+def _svg_path(points: Sequence[tuple[float, float]], tension: float = 0.5) -> str:
+    """Build SVG path data for a smooth curve through the points.
+
+    Each segment is a cubic Bézier with control points from Catmull-Rom tangents.
+
+    Args:
+        points: The x and y coordinates the curve passes through.
+        tension: How far the control points extend along the tangents.
+
+    Returns:
+        The value of the path's "d" attribute.
+    """
+    last = len(points) - 1
+    x0, y0 = points[0]
+    segments = [f"M{x0:.1f},{y0:.1f}"]
+    for i in range(last):
+        prev_x, prev_y = points[max(i - 1, 0)]
+        x1, y1 = points[i]
+        x2, y2 = points[i + 1]
+        next_x, next_y = points[min(i + 2, last)]
+        c1x = x1 + (x2 - prev_x) * tension / 3
+        c1y = y1 + (y2 - prev_y) * tension / 3
+        c2x = x2 - (next_x - x1) * tension / 3
+        c2y = y2 - (next_y - y1) * tension / 3
+        segments.append(f"C{c1x:.1f},{c1y:.1f} {c2x:.1f},{c2y:.1f} {x2:.1f},{y2:.1f}")
+    return "".join(segments)
+
+
 def draw_weather_forecast(
     forecasts: list[HourlyForecast],
     width: int = 400,
     height: int = 40,
     padding: int = 5,
-) -> str | None:
+) -> str:
     """Draw a weather forecast as an SVG image."""
-    import re
-
-    import drawsvg as draw
-    import numpy as np
-    from scipy.interpolate import CubicSpline
-    from scour import scour
-
     forecasts = forecasts[:12]
 
-    # Initialize drawing with width and height
-    d = draw.Drawing(width, height)
-
     # Get min and max temperatures for scaling
     min_temp = min(f.temp for f in forecasts)
     max_temp = max(f.temp for f in forecasts)
@@ -168,102 +202,108 @@ def draw_weather_forecast(
         y = height - padding - (temp - min_temp) * y_scale
         return x, y
 
-    # Prepare data for interpolation in one pass
-    x_data, y_data = zip(*[get_coords(f.temp, f.date) for f in forecasts], strict=True)
-
-    # Create cubic spline to smooth the line
-    cs = CubicSpline(x_data, y_data)
-
-    # Draw smooth line
-    xnew = np.linspace(min(x_data), max(x_data), 100)
-    ynew = cs(xnew)
-
-    # Create a single polyline instead of multiple lines
-    points = list(zip(xnew, ynew, strict=True))
-    path = draw.Path(stroke_width=5, stroke="#CCC", fill="none")
-    path.M(points[0][0], points[0][1])
-    for x, y in points[1:]:
-        path.L(x, y)
-    d.append(path)
-
-    svg = d.as_svg()
-    if svg is None:
-        return None
-
-    options = scour.sanitizeOptions()
-    options.digits = 3
-    options.cdigits = 3
-    options.enable_viewboxing = False
-    options.strip_xml_prolog = True
-    options.indent_type = "none"
-
-    # Return SVG source
-    optimized_svg = scour.scourString(svg, options)
-    optimized_svg = re.sub(r">\s+<", "><", optimized_svg)
-    encoded_svg = base64.b64encode(optimized_svg.encode()).decode()
+    points = [get_coords(f.temp, f.date) for f in forecasts]
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<path d="{_svg_path(points)}" stroke="#CCC" stroke-width="5" fill="none"/>'
+        "</svg>"
+    )
+    encoded_svg = base64.b64encode(svg.encode()).decode()
     return f"url('data:image/svg+xml;base64,{encoded_svg}')"
 
 
-async def generate_image() -> None:
-    """Generate HTML content based on calendar and weather data and write it to an output file."""
-    import dashboard
+async def _get_hti() -> Html2Image:
+    """Return the shared Html2Image instance, creating it on first use."""
+    global _HTI  # noqa: PLW0603
+    async with _HTI_LOCK:
+        if _HTI is None:
+            _HTI = Html2Image(
+                size=(RENDER_WIDTH, RENDER_HEIGHT),
+                custom_flags=[
+                    "--lang=en",
+                    "--headless",
+                    "--hide-scrollbars",
+                    "--no-sandbox",
+                    "--no-first-run",
+                    "--disable-extensions",
+                    "--disable-background-networking",
+                    "--disable-features=dbus",
+                    "--disable-sync",
+                    "--disable-gpu",
+                    "--disable-software-rasterizer",
+                    "--disable-dev-shm-usage",
+                    "--virtual-time-budget=10000",
+                    "--autoplay-policy=no-user-gesture-required",
+                    "--use-fake-ui-for-media-stream",
+                    "--use-fake-device-for-media-stream",
+                ],
+            )
+        return _HTI
+
+
+def _reset_hti() -> None:
+    """Drop the shared Html2Image instance so the next run creates a fresh one."""
+    global _HTI  # noqa: PLW0603
+    _HTI = None
+
+
+def _rotate_and_save(image_path: Path) -> None:
+    """Rotate the rendered image in place and re-save it optimized.
 
-    dashboard_template = Path(dashboard.__file__).parent / "static" / "template.html"
-    dashboard_css = Path(dashboard.__file__).parent / "static" / "style.css"
+    Args:
+        image_path: The path of the image to rotate.
+    """
+    with Image.open(image_path) as im:
+        if RENDER_ROTATE != 0:
+            im.rotate(RENDER_ROTATE, expand=True).save(image_path, optimize=True)
+        else:
+            im.save(image_path, optimize=True)
 
+
+async def generate_image(session: aiohttp.ClientSession) -> None:
+    """Generate HTML content based on calendar and weather data and write it to an output file.
+
+    Args:
+        session: The aiohttp client session, shared across runs to reuse connections.
+    """
     current_datetime = datetime.now(tz=TZ)
     dates, end = get_calendar_dates(current_datetime)
 
     current_date = current_datetime.date()
-    async with aiohttp.ClientSession(auth=BearerAuth(TOKEN)) as session:
-        weather, events = await fetch_data(session, API_URL, CALENDAR_ENTITY_IDS, current_date, end)
+    weather, events = await fetch_data(session, API_URL, CALENDAR_ENTITY_IDS, current_date, end)
 
     dates_with_events = generate_dates_with_events(dates, events, current_date)
     hourly_svg = draw_weather_forecast(weather.hourly)
 
-    template = get_template(dashboard_template)
-    rendered_html = template.render(
+    template = get_template(STATIC_PATH / "template.html")
+    rendered_html = await asyncio.to_thread(
+        template.render,
         weather=weather,
         hourly=itertools.islice(weather.hourly, 1, 13, 2),
         dates_with_events=dates_with_events,
         events=events,
         hourly_svg=hourly_svg,
     )
-    css_str = get_file_contents(dashboard_css)
-    Path("./output.html").write_text(
-        f"""
-        <link rel="stylesheet" href="./dashboard/static/style.css" />
-        {rendered_html}
-        """
-    )
+    css_str = get_file_contents(STATIC_PATH / "style.css")
+    if DEBUG_DUMP_HTML:
+        Path("./output.html").write_text(
+            f"""
+            <link rel="stylesheet" href="./dashboard/static/style.css" />
+            {rendered_html}
+            """
+        )
 
-    hti = Html2Image(
-        size=(RENDER_WIDTH, RENDER_HEIGHT),
-        custom_flags=[
-            "--lang=en",
-            "--headless",
-            "--hide-scrollbars",
-            "--no-sandbox",
-            "--no-first-run",
-            "--disable-features=dbus",
-            "--disable-sync",
-            "--disable-gpu",
-            "--disable-software-rasterizer",
-            "--disable-dev-shm-usage",
-            "--virtual-time-budget=10000",
-            "--autoplay-policy=no-user-gesture-required",
-            "--use-fake-ui-for-media-stream",
-            "--use-fake-device-for-media-stream",
-        ],
-    )
+    hti = await _get_hti()
     output_path = Path(OUTPUT_PATH)
     temp_output = output_path.with_suffix(f".tmp{output_path.suffix}")
-    hti.screenshot(html_str=rendered_html, css_str=css_str, save_as=str(temp_output))
-
-    with Image.open(temp_output) as im:
-        if RENDER_ROTATE != 0:
-            im.rotate(RENDER_ROTATE, expand=True).save(temp_output, optimize=True)
-        else:
-            im.save(temp_output, optimize=True)
+    try:
+        await asyncio.to_thread(
+            hti.screenshot, html_str=rendered_html, css_str=css_str, save_as=str(temp_output)
+        )
+    except Exception:
+        _reset_hti()
+        raise
+    await asyncio.to_thread(_rotate_and_save, temp_output)
 
     temp_output.rename(OUTPUT_PATH)
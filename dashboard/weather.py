@@ -1,11 +1,14 @@
+import itertools
 from dataclasses import dataclass
 from datetime import datetime
 from http import HTTPStatus
+from operator import attrgetter
 from typing import Final, Self
 
 import aiohttp
+import orjson
 
-from dashboard.cache import Cache
+from dashboard.cache import Cache, InFlight
 from dashboard.calendar import TZ
 from dashboard.typed_def import (
     OneCallDailyWeather,
@@ -17,10 +20,35 @@ THUNDERSTORM: Final = 200
 DRIZZLE: Final = 300
 RAIN: Final = 500
 SNOW: Final = 600
+_DEFAULT_ICON: Final = ("wi wi-na", "Unknown")
+_GROUP_ICONS: Final[dict[int, tuple[str, str]]] = {
+    THUNDERSTORM // 100: ("wi wi-thunderstorm", "Thunderstorm"),
+    DRIZZLE // 100: ("wi wi-sprinkle", "Drizzle"),
+    RAIN // 100: ("wi wi-rain", "Rain"),
+    SNOW // 100: ("wi wi-snow", "Snow"),
+}
+_CODE_ICONS: Final[dict[int, tuple[str, str]]] = {
+    701: ("wi wi-fog", "Mist"),
+    711: ("wi wi-smoke", "Smoke"),
+    721: ("wi wi-day-haze", "Haze"),
+    731: ("wi wi-dust", "Dust"),
+    741: ("wi wi-fog", "Fog"),
+    751: ("wi wi-sandstorm", "Sand"),
+    761: ("wi wi-dust", "Dust"),
+    762: ("wi wi-volcano", "Ash"),
+    771: ("wi wi-strong-wind", "Squall"),
+    781: ("wi wi-tornado", "Tornado"),
+    800: ("wi wi-day-sunny", "Clear"),
+    801: ("wi wi-cloud", "Few Clouds"),
+    802: ("wi wi-cloudy", "Partly Cloudy"),
+    803: ("wi wi-cloudy", "Partly Cloudy"),
+    804: ("wi wi-cloudy", "Overcast"),
+}
 weather_cache: "Cache[Weather]" = Cache(600)
+weather_requests: "InFlight[Weather]" = InFlight()
 
 
-@dataclass(order=True)
+@dataclass(slots=True)
 class HourlyForecast:
     date: datetime
 
@@ -40,7 +68,7 @@ class HourlyForecast:
         )
 
 
-@dataclass(order=True)
+@dataclass(slots=True)
 class Forecast:
     date: datetime
 
@@ -62,7 +90,7 @@ class Forecast:
         )
 
 
-@dataclass()
+@dataclass(slots=True)
 class Weather:
     temperature: int
     forecasts: list[Forecast]
@@ -78,8 +106,14 @@ class Weather:
         weather_id = next(iter(one["current"]["weather"]), {"id": 0})["id"]
         weather_class, condition = _weather_to_icon_name(weather_id)
         temperature = int(one["current"]["temp"])
-        forecasts = sorted(Forecast.from_one_call(forecast) for forecast in one["daily"])
-        hourly = sorted(HourlyForecast.from_one_call(forecast) for forecast in one["hourly"])
+        # One Call returns the daily and hourly forecasts in ascending order already,
+        # only sort when a payload is out of order
+        forecasts = [Forecast.from_one_call(forecast) for forecast in one["daily"]]
+        hourly = [HourlyForecast.from_one_call(forecast) for forecast in one["hourly"]]
+        if not all(a.date <= b.date for a, b in itertools.pairwise(forecasts)):
+            forecasts.sort(key=attrgetter("date"))
+        if not all(a.date <= b.date for a, b in itertools.pairwise(hourly)):
+            hourly.sort(key=attrgetter("date"))
         todays_forecast = forecasts.pop(0)
         high_temp = todays_forecast.high_temp
         low_temp = todays_forecast.low_temp
@@ -94,11 +128,14 @@ class Weather:
         )
 
 
-async def get_weather(openweather_api_key: str, lat: float, lon: float) -> Weather:
+async def get_weather(
+    session: aiohttp.ClientSession, openweather_api_key: str, lat: float, lon: float
+) -> Weather:
     """
     Fetch weather data using OpenWeatherMap's One Call API 3.0 asynchronously.
 
     Args:
+        session: The aiohttp client session
         openweather_api_key: Your OpenWeatherMap API key
         lat: Latitude of the location
         lon: Longitude of the location
@@ -111,6 +148,20 @@ async def get_weather(openweather_api_key: str, lat: float, lon: float) -> Weath
     if weather is not None and not stale:
         return weather
 
+    return await weather_requests.run(
+        cache_key, lambda: _fetch_weather(session, openweather_api_key, lat, lon, cache_key)
+    )
+
+
+async def _fetch_weather(
+    session: aiohttp.ClientSession,
+    openweather_api_key: str,
+    lat: float,
+    lon: float,
+    cache_key: str,
+) -> Weather:
+    """Request the weather from OpenWeatherMap, falling back to stale cached data on errors."""
+    weather, _ = weather_cache.load(cache_key)
     params = {
         "lat": lat,
         "lon": lon,
@@ -120,11 +171,25 @@ async def get_weather(openweather_api_key: str, lat: float, lon: float) -> Weath
     }
     url = "https://api.openweathermap.org/data/3.0/onecall"
 
-    async with aiohttp.ClientSession() as session, session.get(url, params=params) as response:
+    headers: dict[str, str] = {}
+    etag, last_modified = weather_cache.validators(cache_key)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    async with session.get(url, params=params, headers=headers) as response:
         if response.status == HTTPStatus.OK:
-            data = await response.json()
+            data = orjson.loads(await response.read())
             weather = Weather.from_one_call(data)
-            weather_cache.save(cache_key, weather)
+            weather_cache.save(
+                cache_key,
+                weather,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        elif response.status == HTTPStatus.NOT_MODIFIED:
+            weather_cache.refresh(cache_key)
 
     assert weather is not None
     return weather
@@ -137,60 +202,6 @@ def _weather_to_icon_name(weather_code: int) -> tuple[str, str]:
     From https://openweathermap.org/weather-conditions
     CSS class names are from https://erikflowers.github.io/weather-icons/
     """
-    css_class = "na"
-    name = "Unknown"
-
-    match weather_code:
-        case _ if THUNDERSTORM <= weather_code <= THUNDERSTORM + 99:
-            css_class = "thunderstorm"
-            name = "Thunderstorm"
-        case _ if DRIZZLE <= weather_code <= DRIZZLE + 99:
-            css_class = "sprinkle"
-            name = "Drizzle"
-        case _ if RAIN <= weather_code <= RAIN + 99:
-            css_class = "rain"
-            name = "Rain"
-        case _ if SNOW <= weather_code <= SNOW + 99:
-            css_class = "snow"
-            name = "Snow"
-        case 701:
-            css_class = "fog"
-            name = "Mist"
-        case 711:
-            css_class = "smoke"
-            name = "Smoke"
-        case 721:
-            css_class = "day-haze"
-            name = "Haze"
-        case 731 | 761:
-            css_class = "dust"
-            name = "Dust"
-        case 741:
-            css_class = "fog"
-            name = "Fog"
-        case 751:
-            css_class = "sandstorm"
-            name = "Sand"
-        case 762:
-            css_class = "volcano"
-            name = "Ash"
-        case 771:
-            css_class = "strong-wind"
-            name = "Squall"
-        case 781:
-            css_class = "tornado"
-            name = "Tornado"
-        case 800:
-            css_class = "day-sunny"
-            name = "Clear"
-        case 801:
-            css_class = "cloud"
-            name = "Few Clouds"
-        case 802 | 803:
-            css_class = "cloudy"
-            name = "Partly Cloudy"
-        case 804:
-            css_class = "cloudy"
-            name = "Overcast"
-
-    return f"wi wi-{css_class}", name
+    if icon := _GROUP_ICONS.get(weather_code // 100):
+        return icon
+    return _CODE_ICONS.get(weather_code, _DEFAULT_ICON)